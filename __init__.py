@@ -4,6 +4,7 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import DOMAIN, PLATFORMS, _LOGGER, DOMAIN, ISSUE_URL_ERROR_MESSAGE, STARTUP_MESSAGE
 from .ecoflow import Ecoflow
@@ -27,7 +28,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     device_info = entry.data.get("device_info")  # This device_info object was stored after the device
                                                  # was setup and has the name and serial needed etc.
     options = entry.data["options"]              # These are the options during setup, including custom device name
-    ecoflow = Ecoflow(user_input["serialnumber"], user_input["username"], user_input["password"])
+    ecoflow = Ecoflow(
+        user_input["serialnumber"], user_input["username"], user_input["password"], async_get_clientsession(hass)
+    )
     
 
     if device_info:
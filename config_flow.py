@@ -10,6 +10,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.exceptions import IntegrationError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import _LOGGER, DOMAIN, ISSUE_URL_ERROR_MESSAGE
 from .ecoflow import Ecoflow, AuthenticationFailed
@@ -29,18 +30,18 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
 async def validate_input_for_device(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
 
-    ecoflow = Ecoflow(data["serialnumber"], data["username"], data["password"])
+    ecoflow = Ecoflow(data["serialnumber"], data["username"], data["password"], async_get_clientsession(hass))
 
     try:
         # Check for authentication
-        # auth_check = await hass.async_add_executor_job(ecoflow.fetch_data)  # TODO what else is needed from fetch_data?
-        auth_check = await hass.async_add_executor_job(ecoflow.authorize)
+        # auth_check = await ecoflow.fetch_data()  # TODO what else is needed from fetch_data?
+        auth_check = await ecoflow.authorize()
         if not auth_check:
             # If authentication check returns False, raise an authentication failure exception
             raise AuthenticationFailed("Invalid authentication!")
 
         # Get device info
-        device = await hass.async_add_executor_job(ecoflow.get_device)
+        device = ecoflow.get_device()
 
         # Return the device object with the device information
         return device
@@ -2,38 +2,199 @@
 # modification of niltrip's version to provide for Power Ocean Dual Master/Slave Inverter Installations
 # Andy Bowden Jan9 2025
 
-import requests
+import asyncio
 import base64
+import functools
+import math
+import random
 import re
-from collections import namedtuple
-from requests.exceptions import RequestException
+from dataclasses import dataclass, replace
+from typing import Any
+
+import aiohttp
 
 from homeassistant.exceptions import IntegrationError
 from homeassistant.util.json import json_loads
 
 from .const import _LOGGER, ISSUE_URL_ERROR_MESSAGE
 
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+RETRY_ATTEMPTS = 3  # connection errors and gateway errors are retried with exponential backoff
+RETRY_MAX_WAIT = 10  # seconds, upper bound of the backoff before jitter
+RETRY_STATUS = (502, 503, 504)
+
+# mppt warning/fault code keys of the JTS1_EMS_CHANGE_REPORT
+_MPPT_CODE_RE = re.compile(r"mppt.*Code")
+
+
+# Better storage of PowerOcean endpoint, slots keep the many long-lived instances small
+@dataclass(frozen=True, slots=True)
+class PowerOceanEndPoint:
+    """Class representing a PowerOcean sensor endpoint"""
+
+    internal_unique_id: str
+    serial: str
+    name: str
+    friendly_name: str
+    value: Any
+    unit: str | None
+    description: str
+    icon: str | None
+
+# unit by key suffix, the suffixes of one length never end with a suffix of another length
+_UNIT_SUFFIX = {
+    "pwr": "W",
+    "Pwr": "W",
+    "Power": "W",
+    "amp": "A",
+    "Amp": "A",
+    "soc": "%",
+    "Soc": "%",
+    "soh": "%",
+    "Soh": "%",
+    "vol": "V",
+    "Vol": "V",
+    "Watth": "Wh",
+    "Energy": "Wh",
+}
+
+
+def _get_unit(key):
+    """Function get unit from key Name."""
+    unit = _UNIT_SUFFIX.get(key[-3:]) or _UNIT_SUFFIX.get(key[-5:]) or _UNIT_SUFFIX.get(key[-6:])
+    if unit is None:
+        if "Generation" in key:
+            unit = "kWh"
+        elif key[:6] == "bpTemp":  # TODO: alternative: 'Temp' in key
+            unit = "°C"
+
+    return unit
+
+
+# TODO: hier könnte man noch mehr definieren bzw ein translation dict erstellen +1
+_DESCRIPTIONS = {
+    "sysLoadPwr": "Hausnetz",
+    "sysGridPwr": "Stromnetz",
+    "mpptPwr": "Solarertrag",
+    "bpPwr": "Batterieleistung",
+    "bpSoc": "Ladezustand der Batterie",
+    "online": "Online",
+    "systemName": "System Name",
+    "createTime": "Installations Datum",
+    # Battery descriptions
+    "bpVol": "Batteriespannung",
+    "bpAmp": "Batteriestrom",
+    "bpCycles": "Ladezyklen",
+    "bpTemp": "Temperatur der Batteriezellen",
+}
+
+
+def _get_description(key):
+    """Function get description from key Name, defaults to the key itself."""
+    return _DESCRIPTIONS.get(key, key)
+
+
+# sensors taken from response['data']
+# sensors not in use: note, bpSoc is taken from the EMS CHANGE report
+# [ 'bpSoc', 'sysBatChgUpLimit', 'sysBatDsgDownLimit','sysGridSta', 'sysOnOffMachineStat',
+#   'location', 'timezone', 'quota']
+_DATA_KEYS = frozenset(
+    {
+        "sysLoadPwr",
+        "sysGridPwr",
+        "mpptPwr",
+        "bpPwr",
+        "online",
+        "todayElectricityGeneration",
+        "monthElectricityGeneration",
+        "yearElectricityGeneration",
+        "totalElectricityGeneration",
+        "systemName",
+        "createTime",
+    }
+)
+
+# sensors taken from 'JTS1_EMS_CHANGE_REPORT', mppt warning/fault codes are added per report
+_EMS_CHANGE_KEYS = frozenset(
+    {
+        "bpTotalChgEnergy",
+        "bpTotalDsgEnergy",
+        "bpSoc",
+        "bpOnlineSum",  # number of batteries
+        "emsCtrlLedBright",
+        "emsWordMode",  # added line to get export/normal state
+    }
+)
 
-# Better storage of PowerOcean endpoint
-PowerOceanEndPoint = namedtuple(
-    "PowerOceanEndPoint",
-    "internal_unique_id, serial, name, friendly_name, value, unit, description, icon",
+# sensors taken from each battery of 'JTS1_BP_STA_REPORT'
+_BATTERY_KEYS = frozenset(
+    {
+        "bpPwr",
+        "bpSoc",
+        "bpSoh",
+        "bpVol",
+        "bpAmp",
+        "bpCycles",
+        "bpSysState",
+        "bpRemainWatth",
+    }
 )
 
+# sensors taken from 'JTS1_EMS_HEARTBEAT'
+# sens_select = d.keys()  # 68 Felder
+_EMS_HEARTBEAT_KEYS = frozenset(
+    {
+        "bpRemainWatth",
+        "emsBpAliveNum",
+        "emsBpPower",
+        "pcsActPwr",
+        "pcsMeterPower",
+    }
+)
+
+# special icons of the response data and battery sensors by key, and of the mpptPv string sensors by key suffix
+_ICONS_EXACT = {"mpptPwr": "mdi:solar-power", "bpAmp": "mdi:current-dc"}
+_ICON_SUFFIX = {"amp": "mdi:current-dc", "pwr": "mdi:solar-power"}
+
+# per-phase sub-reports of 'JTS1_EMS_HEARTBEAT'
+_PHASES = ("pcsAPhase", "pcsBPhase", "pcsCPhase")
+
+# (unit, description, icon) per battery sensor, the battery keys are fixed so this is built once
+_BAT_FIELD_META = {key: (_get_unit(key), _get_description(key), _ICONS_EXACT.get(key)) for key in _BATTERY_KEYS}
+
+# (unit, description) per key, cached as the keys are drawn from the fixed vocabulary of the API
+@functools.lru_cache(maxsize=256)
+def _get_meta(key):
+    """Function get (unit, description) from key Name."""
+    return _get_unit(key), _get_description(key)
+
 
 # ecoflow_api to detect device and get device info, fetch the actual data from the PowerOcean device, and parse it
 # Rename, there is an official API since june
 class Ecoflow:
     """Class representing Ecoflow"""
 
-    def __init__(self, serialnumber, username, password):
+    def __init__(self, serialnumber, username, password, session: aiohttp.ClientSession):
         self.sn = serialnumber
         self.unique_id = serialnumber
         self.ecoflow_username = username
         self.ecoflow_password = password
+        # login payload, the password is base64 encoded once instead of on every login
+        self._auth_payload = {
+            "email": username,
+            "password": base64.b64encode(password.encode()).decode(),
+            "scene": "IOT_APP",
+            "userType": "ECOFLOW",
+        }
         self.token = None
         self.device = None
-        self.session = requests.Session()
+        self._endpoint_cache: dict[str, PowerOceanEndPoint] = {}  # last endpoint per internal_unique_id
+        # Home Assistant's shared client session, its connection pool is reused between polls
+        self.session = session
+        self.headers = {"lang": "en_US", "content-type": "application/json",
+                        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:133.0) Gecko/20100101 Firefox/133.0"}
+        # device poll headers, built once and kept in sync with the auth token in authorize()
+        self.fetch_headers = {**self.headers, "product-type": "86"}
         self.url_iot_app = "https://api.ecoflow.com/auth/login"
         self.url_user_fetch = f"https://api-e.ecoflow.com/provider-service/user/device/detail?sn={self.sn}"
         # self.authorize()  # authorize user and get device details
@@ -52,31 +213,12 @@ class Ecoflow:
 
         return self.device
 
-    def authorize(self):
+    async def authorize(self):
         """Function authorize"""
         auth_ok = False  # default
-        headers = {"lang": "en_US", "content-type": "application/json",
-                  "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:133.0) Gecko/20100101 Firefox/133.0"}
-
-        _LOGGER.debug(f"password_is_{self.ecoflow_password}")
-        self.ecoflow_password = "passwordforR&Duse123"
-        data = {
-            "email": self.ecoflow_username,
-            "password": base64.b64encode(self.ecoflow_password.encode()).decode(),
-            "scene": "IOT_APP",
-            "userType": "ECOFLOW",
-        }
-        _LOGGER.debug(f"password_is_now_{self.ecoflow_password}")
-        try:
-            url = self.url_iot_app
-            _LOGGER.info("Login to EcoFlow API %s", {url})
-            request = requests.post(url, json=data, headers=headers)
-            response = self.get_json_response(request)
 
-        except ConnectionError:
-            error = f"Unable to connect to {self.url_iot_app}. Device might be offline."
-            _LOGGER.warning(error + ISSUE_URL_ERROR_MESSAGE)
-            raise IntegrationError(error)
+        _LOGGER.info("Login to EcoFlow API %s", {self.url_iot_app})
+        response = await self._request("POST", self.url_iot_app, json=self._auth_payload)
 
         try:
             self.token = response["data"]["token"]
@@ -86,31 +228,60 @@ class Ecoflow:
         except KeyError as key:
             raise Exception(f"Failed to extract key {key} from response: {response}")
 
+        # send the token with every subsequent request
+        self.headers["authorization"] = self.fetch_headers["authorization"] = f"Bearer {self.token}"
+
         _LOGGER.info("Successfully logged in: %s", {user_name})
-        try:
-          _LOGGER.debug(f"ecoflow_device_info_product_{device_info.get("product")}")
-        except:
-          _LOGGER.debug(f"ecoflow_device_info_failed")
- 
+
         self.get_device()  # collect device info
 
         return auth_ok
 
-    def get_json_response(self, request):
+    async def _request(self, method, url, **kwargs):
+        """Send a request and return its json response, retrying transient errors."""
+        kwargs.setdefault("headers", self.headers)
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            try:
+                async with self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs) as request:
+                    if request.status not in RETRY_STATUS or attempt == RETRY_ATTEMPTS:
+                        return await self.get_json_response(request)
+                    _LOGGER.debug("HTTP status %s from %s, retrying", request.status, url)
+
+            except (aiohttp.ClientError, TimeoutError) as e:
+                if attempt == RETRY_ATTEMPTS:
+                    if isinstance(e, aiohttp.ClientConnectionError):
+                        error = f"Unable to connect to {url}. Device might be offline."
+                    else:
+                        error = f"Error while requesting {url}: {e}"
+                    _LOGGER.warning(error + ISSUE_URL_ERROR_MESSAGE)
+                    raise IntegrationError(error) from e
+                _LOGGER.debug("Request to %s failed: %s, retrying", url, e)
+
+            # exponential backoff with jitter, so retries of several installations do not line up
+            await asyncio.sleep(min(2 ** (attempt - 1), RETRY_MAX_WAIT) + random.uniform(0, 1))
+
+    async def get_json_response(self, request):
         """Function get json response"""
-        if request.status_code != 200:
+        if request.status == 401:
+            # bad credentials or expired token, retrying will not help
+            raise AuthenticationFailed(f"Got HTTP status code 401: {await request.text()}")
+        if request.status != 200:
             raise Exception(
-                f"Got HTTP status code {request.status_code}: {request.text}"
+                f"Got HTTP status code {request.status}: {await request.text()}"
             )
+        # parse the raw bytes, which skips decoding the body to str first
+        body = await request.read()
+        try:
+            response = json_loads(body)
+        except Exception as error:
+            raise Exception(f"Failed to parse response: {body.decode(errors='replace')} Error: {error}")
+        # the response is parsed once, the error messages reuse the parsed object
         try:
-            response = json_loads(request.text)
             response_message = response["message"]
         except KeyError as key:
-            raise Exception(
-                f"Failed to extract key {key} from {json_loads(request.text)}"
-            )
-        except Exception as error:
-            raise Exception(f"Failed to parse response: {request.text} Error: {error}")
+            raise Exception(f"Failed to extract key {key} from {response}")
+        except TypeError:
+            raise Exception(f"Unexpected response, expected a JSON object: {response}")
 
         if response_message.lower() != "success":
             raise Exception(f"{response_message}")
@@ -118,86 +289,43 @@ class Ecoflow:
         return response
 
     # Fetch the data from the PowerOcean device, which then constitues the Sensors
-    def fetch_data(self):
+    async def fetch_data(self):
         """Function fetch data from Url."""
         # curl 'https://api-e.ecoflow.com/provider-service/user/device/detail?sn={self.sn}}' \
         # -H 'authorization: Bearer {self.token}'
 
-        url = self.url_user_fetch
-        try:
-            headers = {"authorization": f"Bearer {self.token}", "lang": "en_US", "content-type": "application/json", 
-                       "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:133.0) Gecko/20100101 Firefox/133.0",
-                       "product-type": "86"}
-            request = requests.get(self.url_user_fetch, headers=headers, timeout=30)
-            response = self.get_json_response(request)
-
-            _LOGGER.debug(f"response_in_fetch_data_86_is_{response}")
-
-
-            return self._get_sensors(response)
-
-        except ConnectionError:
-            error = f"ConnectionError in fetch_data: Unable to connect to {url}. Device might be offline."
-            _LOGGER.warning(error + ISSUE_URL_ERROR_MESSAGE)
-            raise IntegrationError(error)
-
-        except RequestException as e:
-            error = f"RequestException in fetch_data: Error while fetching data from {url}: {e}"
-            _LOGGER.warning(error + ISSUE_URL_ERROR_MESSAGE)
-            raise IntegrationError(error)
-
-    def __get_unit(self, key):
-        """Function get unit from key Name."""
-        if key.endswith(("pwr", "Pwr", "Power")):
-            unit = "W"
-        elif key.endswith(("amp", "Amp")):
-            unit = "A"
-        elif key.endswith(("soc", "Soc", "soh", "Soh")):
-            unit = "%"
-        elif key.endswith(("vol", "Vol")):
-            unit = "V"
-        elif key.endswith(("Watth", "Energy")):
-            unit = "Wh"
-        elif "Generation" in key:
-            unit = "kWh"
-        elif key.startswith("bpTemp"):  # TODO: alternative: 'Temp' in key
-            unit = "°C"
+        response = await self._request("GET", self.url_user_fetch, headers=self.fetch_headers)
+
+        _LOGGER.debug("response_in_fetch_data_86_is_%s", response)
+
+        return self._get_sensors(response)
+
+    def _endpoint(self, internal_unique_id, serial, name, friendly_name, value, unit, description, icon):
+        """Return the endpoint of a sensor, reusing the previous one while its value is unchanged."""
+        cached = self._endpoint_cache.get(internal_unique_id)
+        if (
+            cached is not None
+            and cached.name == name
+            and cached.friendly_name == friendly_name
+            and cached.description == description
+        ):
+            if cached.value == value:
+                return cached
+            endpoint = replace(cached, value=value)
         else:
-            unit = None
-
-        return unit
-
-    def __get_description(self, key):
-        # TODO: hier könnte man noch mehr definieren bzw ein translation dict erstellen +1
-        # Comment: Ich glaube hier brauchen wir n
-        description = key  # default description
-        if key == "sysLoadPwr":
-            description = "Hausnetz"
-        if key == "sysGridPwr":
-            description = "Stromnetz"
-        if key == "mpptPwr":
-            description = "Solarertrag"
-        if key == "bpPwr":
-            description = "Batterieleistung"
-        if key == "bpSoc":
-            description = "Ladezustand der Batterie"
-        if key == "online":
-            description = "Online"
-        if key == "systemName":
-            description = "System Name"
-        if key == "createTime":
-            description = "Installations Datum"
-        # Battery descriptions
-        if key == "bpVol":
-            description = "Batteriespannung"
-        if key == "bpAmp":
-            description = "Batteriestrom"
-        if key == "bpCycles":
-            description = "Ladezyklen"
-        if key == "bpTemp":
-            description = "Temperatur der Batteriezellen"
-
-        return description
+            endpoint = PowerOceanEndPoint(
+                internal_unique_id,
+                serial,
+                name,
+                friendly_name,
+                value,
+                unit,
+                description,
+                icon,
+            )
+        self._endpoint_cache[internal_unique_id] = endpoint
+
+        return endpoint
 
     def _get_sensors(self, response):
         
@@ -205,115 +333,77 @@ class Ecoflow:
         
         serials = self._get_serial_numbers(response)
         
-        _LOGGER.debug(f"no_of_inverters_found_=_{serials}")
+        _LOGGER.debug("no_of_inverters_found_=_%s", serials)
         
         # if serials = 2, installation is a dual inverter one
         
         if serials == 2:
             serial_copy = serials
-            _LOGGER.debug(f"dual inverter system")
-            _LOGGER.debug(f"master_sn__{self.master_sn}")
-            _LOGGER.debug(f"slave_sn__{self.slave_sn}")
+            _LOGGER.debug("dual inverter system")
+            _LOGGER.debug("master_sn__%s", self.master_sn)
+            _LOGGER.debug("slave_sn__%s", self.slave_sn)
             master_string = "_master"
             slave_string = "_slave"
         elif serials == 0:
             # if serials = 1, installation is a single inverter
-            _LOGGER.debug(f"single inverter system")
+            _LOGGER.debug("single inverter system")
             master_string = ""
         else:
             # if serials is neither 1 nor 2, installation configuration is unknown and integration cannot function
-            _LOGGER.debug(f"neither single nor dual inverter system - aborting")
-            return
+            _LOGGER.debug("neither single nor dual inverter system - aborting")
+            return {}
             
-        # get sensors from response master segment
-        
-        sensors = self.__get_sensors_data(response)
-        
-        # get sensors from master 'JTS1_ENERGY_STREAM_REPORT'
-        # sensors = self.__get_sensors_energy_stream(self.master_data, sensors)  # is currently not in use
+        # every helper adds its endpoints directly to the sensors dict
+        sensors = {}
 
-        # get sensors from master 'JTS1_EMS_CHANGE_REPORT'
-        
-        sensors = self.__get_sensors_ems_change(self.master_data, sensors, self.master_sn, master_string)
+        # get sensors from response master segment
+        self.__get_sensors_data(response, sensors)
 
-        # get info from master segment JTS1_BP_STA_REPORT
-        
-        sensors = self.__get_sensors_battery(self.master_data, sensors, self.master_sn, master_string)
-        
-        # get info from master segment JTS1_EMS_HEARTBEAT report
-        
-        sensors = self.__get_sensors_ems_heartbeat(self.master_data, sensors, self.master_sn, master_string)
-        
+        # get sensors from master reports, one pass over the master segment
+        self._scan_dataset(self.master_data, self.master_sn, master_string, sensors)
 
         if serials == 2:
-            # if dual inverter installation, get sensors from response slave segment
-            
-            # get sensors from slave segment 'JTS1_ENERGY_STREAM_REPORT'
-            # sensors = self.__get_sensors_energy_stream(self.slave_data, sensors, self.slave_sn, slave_string)  # is currently not in use
-
-            # get sensors from slave 'JTS1_EMS_CHANGE_REPORT'
-        
-            sensors = self.__get_sensors_ems_change(self.slave_data, sensors, self.slave_sn, slave_string)
-
+            # if dual inverter installation, get sensors from slave reports
+            self._scan_dataset(self.slave_data, self.slave_sn, slave_string, sensors)
 
-            # get info from slave batteries  => JTS1_BP_STA_REPORT
-            sensors = self.__get_sensors_battery(self.slave_data, sensors, self.slave_sn, slave_string)
-        
-            # get info from slave PV strings  => JTS1_EMS_HEARTBEAT
-            sensors = self.__get_sensors_ems_heartbeat(self.slave_data, sensors, self.slave_sn, slave_string)
-        
-        _LOGGER.debug(f"log_full_sensor_details__{sensors}")
-        _LOGGER.debug(f"log_sensor_names__{list(sensors)}")
+        # lazy formatting, the sensors dict is only rendered when debug logging is enabled
+        _LOGGER.debug("log_full_sensor_details__%s", sensors)
         
 
         return sensors
 
-    def __get_sensors_data(self, response):
-        d = response["data"].copy()
-
-        # sensors not in use: note, bpSoc is taken from the EMS CHANGE report
-        # [ 'bpSoc', 'sysBatChgUpLimit', 'sysBatDsgDownLimit','sysGridSta', 'sysOnOffMachineStat',
-        #   'location', 'timezone', 'quota']
-
-        sens_select = [
-            "sysLoadPwr",
-            "sysGridPwr",
-            "mpptPwr",
-            "bpPwr",
-            "online",
-            "todayElectricityGeneration",
-            "monthElectricityGeneration",
-            "yearElectricityGeneration",
-            "totalElectricityGeneration",
-            "systemName",
-            "createTime",
-        ]
-
-        sensors = dict()  # start with empty dict
-        for key, value in d.items():
-            if key in sens_select:  # use only sensors in sens_select
-                if not isinstance(value, dict):
-                    # default uid, unit and descript
-                    unique_id = f"{self.sn}_{key}"
-                    special_icon = None
-                    if key == "mpptPwr":
-                        special_icon = "mdi:solar-power"
-
-                    sensors[unique_id] = PowerOceanEndPoint(
-                        internal_unique_id=unique_id,
-                        serial=self.sn,
-                        name=f"{self.sn}_{key}",
-                        friendly_name=key,
-                        value=value,
-                        unit=self.__get_unit(key),
-                        description=self.__get_description(key),
-                        icon=special_icon,
-                    )
+    def _scan_dataset(self, dataset, inverter_sn, inverter_string, sensors):
+        """Function add sensors from all reports of one inverter segment."""
+        # 'JTS1_ENERGY_STREAM_REPORT' is currently not in use, see __get_sensors_energy_stream
+        for report, handler in self._REPORT_HANDLERS.items():
+            handler(self, dataset[report], report, inverter_sn, inverter_string, sensors)
 
-        return sensors
+    def __get_sensors_data(self, response, sensors):
+        d = response["data"]  # read only, no copy needed
+
+        endpoint = self._endpoint
+        prefix_uid = f"{self.sn}_"  # uid and name share the same prefix
+        for key in _DATA_KEYS & d.keys():  # use only sensors in _DATA_KEYS
+            value = d[key]
+            if not isinstance(value, dict):
+                # default uid, unit and descript
+                unique_id = prefix_uid + key
+                unit, description = _get_meta(key)
+                special_icon = _ICONS_EXACT.get(key)
+
+                sensors[unique_id] = endpoint(
+                    unique_id,
+                    self.sn,
+                    unique_id,
+                    key,
+                    value,
+                    unit,
+                    description,
+                    special_icon,
+                )
 
     # Note, this report is currently not in use. Sensors are taken from response['data']
-    # def __get_sensors_energy_stream(self, response, sensors):
+    # def __get_sensors_energy_stream(self, response):
     #     report = "JTS1_ENERGY_STREAM_REPORT"
     #     d = response["data"]["quota"][report]
     #     prefix = (
@@ -334,423 +424,219 @@ class Ecoflow:
     #                 name=f"{self.sn}_{prefix+key}",
     #                 friendly_name=prefix + key,
     #                 value=value,
-    #                 unit=self.__get_unit(key),
-    #                 description=self.__get_description(key),
+    #                 unit=_get_unit(key),
+    #                 description=_get_description(key),
     #                 icon=None,
     #             )
-    #     dict.update(sensors, data)
     #
-    #     return sensors
+    #     return data
 
-    def __get_sensors_ems_change(self, inverter_dataset, sensors, inverter_sn, inverter_string):
+    def __get_sensors_ems_change(self, d, report, inverter_sn, inverter_string, sensors):
         # function modified to process either master or slave segment
-        
-        report = "JTS1_EMS_CHANGE_REPORT"
-        d = inverter_dataset[report]
-
-
-        sens_select = [
-            "bpTotalChgEnergy",
-            "bpTotalDsgEnergy",
-            "bpSoc",
-            "bpOnlineSum",  # number of batteries
-            "emsCtrlLedBright",
-            "emsWordMode",  # added line to get export/normal state
-        ]
 
+        sens_select = _EMS_CHANGE_KEYS & d.keys()
         # add mppt Warning/Fault Codes
-        keys = d.keys()
-
-        
-        r = re.compile("mppt.*Code")
-        wfc = list(filter(r.match, keys))  # warning/fault code keys
-        sens_select += wfc
-
-        data = {}
-        for key, value in d.items():
-            if key in sens_select:  # use only sensors in sens_select
-                # default uid, unit and descript
-                unique_id = f"{inverter_sn}_{report}_{key}"
-
-                data[unique_id] = PowerOceanEndPoint(
-                    internal_unique_id=unique_id,
-                    serial=inverter_sn,
-                    name=f"{inverter_sn}_{key}",
-                    friendly_name=key + inverter_string,
-                    value=value,
-                    unit=self.__get_unit(key),
-                    description=self.__get_description(key),
-                    icon=None,
-                )
-        dict.update(sensors, data)
-        
-        return sensors
+        sens_select.update(k for k in d if _MPPT_CODE_RE.match(k))  # warning/fault code keys
+
+        endpoint = self._endpoint
+        prefix_uid = f"{inverter_sn}_{report}_"
+        prefix_name = f"{inverter_sn}_"
+        for key in sens_select:  # use only sensors in sens_select
+            value = d[key]
+            # default uid, unit and descript
+            unique_id = prefix_uid + key
+            unit, description = _get_meta(key)
+
+            sensors[unique_id] = endpoint(
+                unique_id,
+                inverter_sn,
+                prefix_name + key,
+                key + inverter_string,
+                value,
+                unit,
+                description,
+                None,
+            )
 
-    def __get_sensors_battery(self, inverter_data, sensors, inverter_sn, inverter_string):
+    def __get_sensors_battery(self, d, report, inverter_sn, inverter_string, sensors):
         
         # function modified to process either master or slave segment
 
-        report = "JTS1_BP_STA_REPORT"
-        # change to process inverter data set
-        
-        d = inverter_data[report]
-        
-        keys = list(d.keys())
-
         # loop over N batteries:
-        batts = [s for s in keys if len(s) > 12]
-        bat_sens_select = [
-            "bpPwr",
-            "bpSoc",
-            "bpSoh",
-            "bpVol",
-            "bpAmp",
-            "bpCycles",
-            "bpSysState",
-            "bpRemainWatth",
-        ]
-
-        data = {}
+        batts = [s for s in d if len(s) > 12]
+
+        endpoint = self._endpoint
         prefix = "bpack"
+        prefix_name = f"{inverter_sn}_"
         for ibat, bat in enumerate(batts):
             name = prefix + "%i_" % (ibat + 1)
+            prefix_uid = f"{inverter_sn}_{report}_{bat}_"
+            prefix_bat_name = prefix_name + name
             d_bat = json_loads(d[bat])
-            for key, value in d_bat.items():
-                if key in bat_sens_select:
-                    # default uid, unit and descript
-                    unique_id = f"{inverter_sn}_{report}_{bat}_{key}"
-                    description_tmp = f"{name}" + self.__get_description(key)
-                    special_icon = None
-                    if key == "bpAmp":
-                        special_icon = "mdi:current-dc"
-                    data[unique_id] = PowerOceanEndPoint(
-                        internal_unique_id=unique_id,
-                        serial=inverter_sn,
-                        name=f"{inverter_sn}_{name + key}",
-                        friendly_name=name + key + inverter_string,
-                        value=value,
-                        unit=self.__get_unit(key),
-                        description=description_tmp,
-                        icon=special_icon,
-                    )
+            for key in _BATTERY_KEYS & d_bat.keys():
+                value = d_bat[key]
+                # default uid, unit and descript
+                unique_id = prefix_uid + key
+                unit, description, special_icon = _BAT_FIELD_META[key]
+                description_tmp = name + description
+                sensors[unique_id] = endpoint(
+                    unique_id,
+                    inverter_sn,
+                    prefix_bat_name + key,
+                    name + key + inverter_string,
+                    value,
+                    unit,
+                    description_tmp,
+                    special_icon,
+                )
             # compute mean temperature of cells
             key = "bpTemp"
-            temp = d_bat[key]
-            value = sum(temp) / len(temp)
-            unique_id = f"{inverter_sn}_{report}_{bat}_{key}"
-            description_tmp = f"{name}" + self.__get_description(key)
-            data[unique_id] = PowerOceanEndPoint(
-                internal_unique_id=unique_id,
-                serial=inverter_sn,
-                name=f"{inverter_sn}_{name + key}",
-                friendly_name=name + key + inverter_string,
-                value=value,
-                unit=self.__get_unit(key),
-                description=description_tmp,
-                icon=None,
+            temp = d_bat.get(key)
+            if not temp:  # no cell temperatures reported, skip the mean
+                continue
+            value = math.fsum(temp) / len(temp)
+            unique_id = prefix_uid + key
+            unit, description = _get_meta(key)
+            description_tmp = name + description
+            sensors[unique_id] = endpoint(
+                unique_id,
+                inverter_sn,
+                prefix_bat_name + key,
+                name + key + inverter_string,
+                value,
+                unit,
+                description_tmp,
+                None,
             )
 
-        dict.update(sensors, data)
-
-        return sensors
-
-    def __get_sensors_ems_heartbeat(self, inverter_data, sensors, inverter_sn, inverter_string):
+    def __get_sensors_ems_heartbeat(self, d, report, inverter_sn, inverter_string, sensors):
         
         # function modified to process either master or slave segment
 
-        report = "JTS1_EMS_HEARTBEAT"
-        d = inverter_data[report]
-
-        # sens_select = d.keys()  # 68 Felder
-        sens_select = [
-            "bpRemainWatth",
-            "emsBpAliveNum",
-            "emsBpPower",
-            "pcsActPwr",
-            "pcsMeterPower",
-
-        ]
-        data = {}
-        for key, value in d.items():
-            if key in sens_select:
-                # default uid, unit and descript
-                unique_id = f"{inverter_sn}_{report}_{key}"
-                description_tmp = self.__get_description(key)
-                data[unique_id] = PowerOceanEndPoint(
-                    internal_unique_id=unique_id,
-                    serial=inverter_sn,
-                    name=f"{inverter_sn}_{key}",
-                    friendly_name=key + inverter_string,
-                    value=value,
-                    unit=self.__get_unit(key),
-                    description=description_tmp,
-                    icon=None,
-                )
+        endpoint = self._endpoint
+        prefix_uid = f"{inverter_sn}_{report}_"
+        prefix_name = f"{inverter_sn}_"
+        for key in _EMS_HEARTBEAT_KEYS & d.keys():
+            value = d[key]
+            # default uid, unit and descript
+            unique_id = prefix_uid + key
+            unit, description_tmp = _get_meta(key)
+            sensors[unique_id] = endpoint(
+                unique_id,
+                inverter_sn,
+                prefix_name + key,
+                key + inverter_string,
+                value,
+                unit,
+                description_tmp,
+                None,
+            )
 
         # special for phases
-        phases = ["pcsAPhase", "pcsBPhase", "pcsCPhase"]
-        for i, phase in enumerate(phases):
+        for phase in _PHASES:
             for key, value in d[phase].items():
                 name = phase + "_" + key
-                unique_id = f"{inverter_sn}_{report}_{name}"
-
-                data[unique_id] = PowerOceanEndPoint(
-                    internal_unique_id=unique_id,
-                    serial=inverter_sn,
-                    name=f"{inverter_sn}_{name}",
-                    friendly_name=f"{name}{inverter_string}",
-                    value=value,
-                    unit=self.__get_unit(key),
-                    description=self.__get_description(key),
-                    icon=None,
+                unique_id = prefix_uid + name
+                unit, description = _get_meta(key)
+
+                sensors[unique_id] = endpoint(
+                    unique_id,
+                    inverter_sn,
+                    prefix_name + name,
+                    name + inverter_string,
+                    value,
+                    unit,
+                    description,
+                    None,
                 )
 
         # special for mpptPv
-        n_strings = len(d["mpptHeartBeat"][0]["mpptPv"])  # TODO: auch als Sensor?
-        mpptpvs = []
-        for i in range(1, n_strings + 1):
-            mpptpvs.append(f"mpptPv{i}")
-        mpptPv_sum = 0.0
-        for i, mpptpv in enumerate(mpptpvs):
-            for key, value in d["mpptHeartBeat"][0]["mpptPv"][i].items():
-                unique_id = f"{inverter_sn}_{report}_mpptHeartBeat_{mpptpv}_{key}"
-                special_icon = None
-                if key.endswith("amp"):
-                    special_icon = "mdi:current-dc"
-                if key.endswith("pwr"):
-                    special_icon = "mdi:solar-power"
-
-                data[unique_id] = PowerOceanEndPoint(
-                    internal_unique_id=unique_id,
-                    serial=self.sn,
-                    name=f"{inverter_sn}_{mpptpv}_{key}",
-                    friendly_name=f"{mpptpv}_{key}{inverter_string}",
-                    value=value,
-                    unit=self.__get_unit(key),
-                    description=self.__get_description(key),
-                    icon=special_icon,
+        mppt_pvs = d["mpptHeartBeat"][0]["mpptPv"]
+        # sum power of all strings
+        mpptPv_sum = math.fsum(pv.get("pwr", 0.0) for pv in mppt_pvs)
+        for i, pv in enumerate(mppt_pvs, 1):  # TODO: Anzahl Strings auch als Sensor?
+            mpptpv = f"mpptPv{i}_"
+            prefix_pv_uid = f"{prefix_uid}mpptHeartBeat_{mpptpv}"
+            prefix_pv_name = prefix_name + mpptpv
+            for key, value in pv.items():
+                unique_id = prefix_pv_uid + key
+                unit, description = _get_meta(key)
+                special_icon = _ICON_SUFFIX.get(key[-3:])
+
+                sensors[unique_id] = endpoint(
+                    unique_id,
+                    self.sn,
+                    prefix_pv_name + key,
+                    mpptpv + key + inverter_string,
+                    value,
+                    unit,
+                    description,
+                    special_icon,
                 )
-                # sum power of all strings
-                if key == "pwr":
-                    mpptPv_sum += value
 
         # create total power sensor of all strings
         name = "mpptPv_pwrTotal"
-        unique_id = f"{inverter_sn}_{report}_mpptHeartBeat_{name}"
-
-        data[unique_id] = PowerOceanEndPoint(
-            internal_unique_id=unique_id,
-            serial=inverter_sn,
-            name=f"{inverter_sn}_{name}",
-            friendly_name=f"{name}{inverter_string}",
-            value=mpptPv_sum,
-            unit=self.__get_unit(key),
-            description="Solarertrag aller Strings",
-            icon="mdi:solar-power",
+        unique_id = f"{prefix_uid}mpptHeartBeat_{name}"
+
+        sensors[unique_id] = endpoint(
+            unique_id,
+            inverter_sn,
+            prefix_name + name,
+            name + inverter_string,
+            mpptPv_sum,
+            "W",
+            "Solarertrag aller Strings",
+            "mdi:solar-power",
         )
 
-        dict.update(sensors, data)
+    # report -> handler, each handler reads only its own report of an inverter segment
+    _REPORT_HANDLERS = {
+        "JTS1_EMS_CHANGE_REPORT": __get_sensors_ems_change,
+        "JTS1_BP_STA_REPORT": __get_sensors_battery,
+        "JTS1_EMS_HEARTBEAT": __get_sensors_ems_heartbeat,
+    }
 
-        return sensors
-        
     def _get_serial_numbers(self, response):
 
         # extra function to determine whether installation installation has single or dual inverter
         # and to create master and slave response segments
     
-        _LOGGER.debug(f"GSM1_=_{self.sn}")
-        _LOGGER.debug(f"response_keys_are_{response.keys()}")
-        _LOGGER.debug(f"try_loop_start")
-
-        try:
-          _LOGGER.debug(f"ecoflow_device_info_product_{device_info.get("product")}")
-        except:
-          _LOGGER.debug(f"ecoflow_device_info_failed")
- 
+        _LOGGER.debug("GSM1_=_%s", self.sn)
+        _LOGGER.debug("response_keys_are_%s", response.keys())
 
-        for key, value in response.items():
-           _LOGGER.debug(f"outermost_keys_are_{key}")
-
-        
-           outermost_key = key
-           p_data = response[outermost_key]
-           _LOGGER.debug(f"for_{outermost_key}_data_is{p_data}")
-
-           _LOGGER.debug(f"try_1")
-           key_count = 1
-           
-           try:
-              _LOGGER.debug(f"no_of_xresponse_keys_is_{len(p_data.keys())}")
-              _LOGGER.debug(f"for_{key}_data_is{p_data}")
-              for key, value in p_data.items():
-                 _LOGGER.debug(f"key_{key_count}_of_{outermost_key}_is_{key}")
-                 key_count =  key_count + 1
-                 inner_key = key
-                 inner_data = p_data[inner_key]
-                 inner_key_count = 1
-                 _LOGGER.debug(f"try_2")
-           
-                 try:
-                    _LOGGER.debug(f"no_of_xresponse_keys_is_{len(inner_data.keys())}")
-                    _LOGGER.debug(f"data_of_{inner_key}_is_{inner_data}")
-                    _LOGGER.debug(f"keys_of_{outermost_key}_are_{inner_data.keys()}")
-                    for key, value in inner_data.items():
-                       _LOGGER.debug(f"key_{inner_key_count}_of_{outermost_key}_of_{inner_key}_is_{key}")
-                       inner_key_count =  inner_key_count + 1
-                       innermost_key = key
-                       innermost_data = inner_data[innermost_key]
-                       innermost_key_count = 1
-                       _LOGGER.debug(f"try_3")
-           
-                       try:
-                          _LOGGER.debug(f"try_3A")
-                          _LOGGER.debug(f"no_of_xresponse_keys_is_{len(innermost_data.keys())}")
-                          _LOGGER.debug(f"try_3B")
-                          _LOGGER.debug(f"data_of_{innermost_key}_is_{innermost_data}")
-                          _LOGGER.debug(f"try_3C")
-                          _LOGGER.debug(f"keys_of_{outermost_key}_are_{innermost_data.keys()}")
-                          _LOGGER.debug(f"try_3D")
-                          for key, value in innermost_data.items():
-                             _LOGGER.debug(f"try_3E")
-                             _LOGGER.debug(f"key_{innermost_key_count}_of_{innermost_key}_of_{inner_key}_is_{key}")
-                             _LOGGER.debug(f"try_3F")
-                             innermost_key_count =  innermost_key_count + 1
-                             _LOGGER.debug(f"try_3G")
-                             core_key = key
-                             core_data = innermost_data[core_key]
-                             core_key_count = 1
-                             _LOGGER.debug(f"try_4")
-           
-                             try:
-                                _LOGGER.debug(f"try_4A")
-                                _LOGGER.debug(f"no_of_xresponse_keys_is_{len(core_data.keys())}")
-                                _LOGGER.debug(f"data_of_{core_key}_is_{core_data}")
-                                _LOGGER.debug(f"keys_of_{outermost_key}_are_{core_data.keys()}")
-                                for key, value in core_data.items():
-                                   _LOGGER.debug(f"key_{core_key_count}_of_{core_key}_of_{innermost_key}_of_{inner_key}_is_{key}")
-                                   core_key_count =  core_key_count + 1
-                             except:
-                                _LOGGER.debug(f"{core_key}_has_no_subsubsubsubkeys")
-
-                       except:
-                          _LOGGER.debug(f"{innermost_key}_has_no_subsubsubkeys")
-
-                 except:
-                    _LOGGER.debug(f"{inner_key}_has_no_subsubkeys")
-
-           except:
-              _LOGGER.debug(f"{outermost_key}_has_no_subkeys")
-
- #       for key, value in p_data.items():
-  #         _LOGGER.debug(f"keys_is_{key}")
- #         _LOGGER.debug(f"sub_data_is_{p_data[key]}")
-
- #       p_data = response["message"]
-
- #       _LOGGER.debug(f"xresponse_keys_are_{p_data.keys()}")
- #       _LOGGER.debug(f"no_of_xresponse_keys_is_{len(p_data.keys())}")
-
-  #      for key, value in p_data.items():
-   #        _LOGGER.debug(f"keys_is_{key}")
-  #         _LOGGER.debug(f"key_type_is_{type(key)}")
-
-  #      p_data = response["data"]
-
-  #      _LOGGER.debug(f"xresponse_keys_are_{p_data.keys()}")
-   #     _LOGGER.debug(f"no_of_xresponse_keys_is_{len(p_data.keys())}")
-
-  #      for key, value in p_data.items():
-  #         _LOGGER.debug(f"keys_is_{key}")
-  #         _LOGGER.debug(f"key_type_is_{type(key)}")
-  #         _LOGGER.debug(f"sub_data_is_{p_data[key]}")
-
-  
-        p_data = response["data"]
-
-        _LOGGER.debug(f"xresponse_keys_are_{p_data.keys()}")
-        _LOGGER.debug(f"no_of_xresponse_keys_is_{len(p_data.keys())}")
-
-        for key, value in p_data.items():
-           _LOGGER.debug(f"keys_is_{key}")
-           _LOGGER.debug(f"key_type_is_{type(key)}")
-
-#            next = p_data[key]
-#            for next_key, next_value in next.items:
-#                _LOGGER.debug(f"next_key_type_is_{type(next_key)}")
-  
-
-
-        p_data = response["data"]
-        _LOGGER.debug(f"response_data_is_{p_data}")
-        _LOGGER.debug(f"response_data_keys_are_{p_data.keys()}")
-
-        p_data_quota = response["data"]["quota"]
-        _LOGGER.debug(f"response_data_quota_is_{p_data_quota}")
-        _LOGGER.debug(f"response_data_quota_keys_are_{p_data_quota.keys()}")
-
-        p_data_parallel = response["data"]["parallel"]
-        _LOGGER.debug(f"response_data_parallel_is_{p_data_parallel}")
-        _LOGGER.debug(f"response_data_parallel_keys_are_{p_data_parallel.keys()}")
-
-        p_data_parallel_master = response["data"]["parallel"]["J32EZEH4ZG3S0104"]
-        _LOGGER.debug(f"response_data_parallel_master_is_{p_data_parallel_master}")
-        _LOGGER.debug(f"response_data_parallel_master_keys_are_{p_data_parallel_master.keys()}")
-
-        p_data_parallel_slave = response["data"]["parallel"]["J32EZEH4ZG3S0042"]
-        _LOGGER.debug(f"response_data_parallel_slave_is_{p_data_parallel_slave}")
-        _LOGGER.debug(f"response_data_parallel_slave_keys_are_{p_data_parallel_slave.keys()}")
-
-
-        if 'parallel' in p_data.keys():
-            # installation is dual inverter one
-            # p portion of response contains master and slave segments
-            p = response["data"]["parallel"]
-        else:
+        data = response["data"]
+        parallel = data.get("parallel")
+        if not parallel:
             # installation is single inverter, create master segment
-            self.master_data = response["data"]["quota"]
+            self.master_sn = self.sn
+            self.master_data = data["quota"]
             return 0
-        
-        # get keys of the 'data' 'parallel' segment
-        keys_2 = p.keys()
-    
-        # first serial number is the first key of the 'data' 'parallel' segment
-        
-        self.first_sn = next(iter(keys_2))
-        
-    
 
-        # second serial number is the last key of the 'data' 'parallel' segment
-        
-        self.second_sn = next(reversed(keys_2))
-        
-        # create inverter segments
-        
-        if self.first_sn == self.sn:
-            # first segment relates to master inverter
-            self.master_sn = self.first_sn
-            self.slave_sn = self.second_sn
-            self.master_data = response["data"]["parallel"][self.first_sn]
-            self.master_data = response["data"]["parallel"][self.first_sn]
-            self.slave_data = response["data"]["parallel"][self.second_sn]
-        else:
-            # first segment relates to slave inverter
-            self.master_sn = self.second_sn
-            self.slave_sn = self.first_sn
-            self.master_data = response["data"]["parallel"][self.second_sn]
-            self.slave_data = response["data"]["parallel"][self.first_sn]
+        # 2 denotes dual inverter installation
+        # if not 2 can't be handled, return before any segment is touched
+        if len(parallel) != 2:
+            return len(parallel)
+
+        # installation is dual inverter one
+        # parallel portion of response contains master and slave segments, keyed by serial number
+        sns = list(parallel)
 
+        # the configured serial number is the master inverter, the other segment is the slave
+        if sns[0] == self.sn:
+            self.master_sn, self.slave_sn = sns[0], sns[-1]
+        else:
+            self.master_sn, self.slave_sn = sns[-1], sns[0]
 
-       
+        # create inverter segments
+        self.master_data = parallel[self.master_sn]
+        self.slave_data = parallel[self.slave_sn]
 
-        # 2 denotes dual inverter installation
-        # if not 2 can't be handled
+        _LOGGER.debug("master_serial_number_is_%s", self.master_sn)
+        _LOGGER.debug("slave_serial_number_is_%s", self.slave_sn)
+        _LOGGER.debug("get_serial_numbers_returning_%s", len(sns))
 
-        _LOGGER.debug(f"master_serial_number_is_{self.master_sn}")
-        _LOGGER.debug(f"slave_serial_number_is_{self.slave_sn}")
-        _LOGGER.debug(f"get_serial_numbers_returning_{len(p)}")
+        return len(sns)
 
-        return len(p)
-  
 
 class AuthenticationFailed(Exception):
     """Exception to indicate authentication failure."""
@@ -36,7 +36,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     # Call EcoFlow to get access to the API data
     try:
-        auth_check = await hass.async_add_executor_job(ecoflow.authorize)
+        auth_check = await ecoflow.authorize()
 
         if not auth_check:
             # If device returns False or is empty, log an error and return
@@ -51,7 +51,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
     try:
         # Fetch the sensor data from the device
-        data = await hass.async_add_executor_job(ecoflow.fetch_data)
+        data = await ecoflow.fetch_data()
 
         if not data:
             # If data returns False or is empty, log an error and return
@@ -110,7 +110,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
         # Fetch the full dataset once from the API
         try:
-            full_data = await hass.async_add_executor_job(ecoflow.fetch_data)
+            full_data = await ecoflow.fetch_data()
 
         except Exception as e:
             _LOGGER.error(